@@ -1,13 +1,19 @@
 import asyncio
 import base64
+import concurrent.futures
 import dataclasses
 import datetime
+import fcntl
+import functools
+import hashlib
 import io
-import json
 import multiprocessing
 import os
 import pathlib
 import random
+import re
+import shutil
+import ssl
 import time
 import typing
 import urllib
@@ -15,14 +21,14 @@ import uuid
 
 import dotenv
 import httpx
+import orjson
 import pydub
 import pymongo
-import regex as re
 import tqdm
 import websockets
 from bs4 import BeautifulSoup, Tag
 from fastapi import FastAPI, Response
-from fastapi.responses import HTMLResponse, StreamingResponse
+from fastapi.responses import HTMLResponse, ORJSONResponse, StreamingResponse
 from fastapi.staticfiles import StaticFiles
 from loguru import logger
 from pydantic.dataclasses import dataclass
@@ -33,9 +39,18 @@ CONFIG_DIR = pathlib.Path("config")
 dotenv.load_dotenv(CONFIG_DIR / ".env")
 
 ELEVENLABS_API_KEY = os.environ["ELEVENLABS_API_KEY"]
-
-with open(CONFIG_DIR / "voices.json") as f:
-    VOICES = json.load(f)
+# Raw PCM skips an ffmpeg decode per section, but is opt-in: pcm_44100 (the quality
+# of the default MP3 stream) needs a Pro plan or above. 0 keeps the MP3 stream.
+ELEVENLABS_PCM_RATE = int(os.getenv("ELEVENLABS_PCM_RATE", 0))
+ELEVENLABS_OUTPUT_FORMAT = (
+    f"&output_format=pcm_{ELEVENLABS_PCM_RATE}" if ELEVENLABS_PCM_RATE else ""
+)
+# Shared so the CA bundle is loaded once rather than for every websocket
+ELEVENLABS_SSL_CONTEXT = ssl.create_default_context()
+
+VOICES = orjson.loads((CONFIG_DIR / "voices.json").read_bytes())
+USABLE_VOICES = [v for v in VOICES if v["use"]]
+VOICES_BY_NAME = {v["name"]: v for v in VOICES}
 
 GLOBAL_REPLACE = [
     ("sumaah", "Suhmah"),
@@ -54,6 +69,12 @@ GLOBAL_REPLACE = [
     ("profounddecisions.co.uk", ""),
     ("mareave", "mareeve"),
 ]
+# All replacements in one alternation, so each text is scanned once
+GLOBAL_REPLACE_PATTERN = re.compile(
+    "|".join(f"(?P<r{i}>{f})" for i, (f, _) in enumerate(GLOBAL_REPLACE)),
+    re.IGNORECASE,
+)
+GLOBAL_REPLACE_TARGETS = {f"r{i}": t for i, (_, t) in enumerate(GLOBAL_REPLACE)}
 POST_REPLACE = [
     (["Year", "of", "the", "Empire[,;.:?!'\")]*"], "YE", 1),
     # (["out", "of", "character[,;.:?!'\")]*"], "OOC", 0),
@@ -72,6 +93,10 @@ MIN_TIME = 1
 HOME_ID = ""
 DISALLOWED_ID = "text-to-speech:disallowed"
 ERROR_ID = "text-to-speech:error"
+# Kept outside WEB_DIR so cached audio is not served by the static mount
+CACHE_DIR = pathlib.Path("/app/cache")
+TEMPORARY_SUFFIX = ".tmp"
+TTS_CACHE_DIR = CACHE_DIR / "text-to-speech"
 
 HTTP_LOOKUP = {
     "done": 200,
@@ -101,12 +126,35 @@ DISALLOWED_ARTICLES = [
     r"\d{3}YE_\w+_\w+_imperial_elections",
     DISALLOWED_ID,
 ]
+DISALLOWED_ARTICLES_PATTERNS = [
+    re.compile(r, re.IGNORECASE) for r in DISALLOWED_ARTICLES
+]
 MAX_SECTIONS = 200
+MAX_TTS_CHARACTERS = 2500
+SENTENCE_SPLIT_PATTERN = re.compile(r"(?<=[.!?…])\s+")
 ALLOWED_ACTIRLES = [  # Overrides the 200 section limit
     "Not_to_conquer",
 ]
 
 GENERATE_ARTICLES = bool(os.getenv("GENERATE_ARTICLES", False))
+ARTICLE_WORKERS = int(os.getenv("ARTICLE_WORKERS", multiprocessing.cpu_count()))
+MAX_TTS_REQUESTS = int(os.getenv("MAX_TTS_REQUESTS", 16))
+# Every worker needs at least one TTS request slot, so more workers than
+# MAX_TTS_REQUESTS would exceed it
+if ARTICLE_WORKERS > MAX_TTS_REQUESTS:
+    logger.warning(
+        f"Limiting article workers from {ARTICLE_WORKERS} to {MAX_TTS_REQUESTS} to stay within MAX_TTS_REQUESTS"
+    )
+    ARTICLE_WORKERS = MAX_TTS_REQUESTS
+TTS_CONCURRENCY = int(os.getenv("TTS_CONCURRENCY", 8))
+# Each article worker runs one manuscript at a time, so splitting the global limit
+# per process keeps the total under MAX_TTS_REQUESTS without cross-process locking
+TTS_REQUESTS_PER_WORKER = MAX_TTS_REQUESTS // ARTICLE_WORKERS
+PROGRESS_UPDATE_INTERVAL = 5  # seconds
+MAX_COMPLETE_AUDIO_ATTEMPTS = 2  # the first render plus one after regenerating
+STALE_TEMPORARY_AGE = 60 * 60  # seconds
+TTS_CACHE_MAX_SIZE = int(os.getenv("TTS_CACHE_MAX_SIZE", 10 * 1024**3))  # bytes
+TTS_CACHE_PRUNE_INTERVAL = 10 * 60  # seconds
 REFRESH_ARTICLES = bool(os.getenv("REFRESH_ARTICLES", False))
 ALWAYS_UPDATE: list[str] = [
     # DISALLOWED_ID,
@@ -125,10 +173,22 @@ SECTION_TYPE_PRE_DELAY = {
     "ul": 0.5,
     "cite": 0.5,
 }
-app = FastAPI()
-mongodb_client: pymongo.MongoClient = pymongo.MongoClient(MONGODB_DOMAIN, 27017)
-DB = mongodb_client["database"]
-COLLECTION = DB["manuscripts"]
+app = FastAPI(default_response_class=ORJSONResponse)
+
+
+def connect_collection() -> pymongo.collection.Collection:
+    mongodb_client: pymongo.MongoClient = pymongo.MongoClient(MONGODB_DOMAIN, 27017)
+    return mongodb_client["database"]["manuscripts"]
+
+
+COLLECTION = connect_collection()
+ARTICLES_IN_PROGRESS_LOCK = multiprocessing.Lock()
+EXPORT_POOL = concurrent.futures.ThreadPoolExecutor(max_workers=8)
+WIKI_CLIENT = httpx.Client(
+    timeout=httpx.Timeout(60, connect=10),
+    headers={"User-Agent": "empire-auto-winds"},
+    limits=httpx.Limits(max_keepalive_connections=5),
+)
 
 
 @dataclass
@@ -165,13 +225,38 @@ class ElevenLabsSystemBusyError(ElevenLabsError):
 
 
 ARTICLE_REPR_KEYS = ["title", "url", "sections"]
+CACHED_MANUSCRIPT_KEYS = [
+    *ARTICLE_REPR_KEYS,
+    "outro",
+    "img",
+    "etag",
+    "last_modified",
+]
 
 
 def article_repr(article: dict) -> dict:
     return {k: v for k, v in article.items() if k in ARTICLE_REPR_KEYS}
 
 
+def manuscript_hash(article: dict) -> str:
+    return hashlib.blake2b(
+        orjson.dumps(
+            [
+                article["title"],
+                article["url"],
+                [
+                    [s["section_type"], [span["text"] for span in s["spans"]]]
+                    for s in article["sections"]
+                ],
+            ]
+        ),
+        digest_size=16,
+    ).hexdigest()
+
+
 def manuscript_changed(article0: dict, article1: dict) -> bool:
+    if "content_hash" in article0 and "content_hash" in article1:
+        return bool(article0["content_hash"] != article1["content_hash"])
     return article_repr(article0) != article_repr(article1)
 
 
@@ -187,7 +272,8 @@ async def elevenlabs_tts_alignment(
 ) -> tuple[pydub.AudioSegment, list[dict]]:
     voice = ELVoice(**input_voice)
     async with websockets.connect(
-        f"wss://api.elevenlabs.io/v1/text-to-speech/{voice.id}/stream-input?model_id={voice.model}"
+        f"wss://api.elevenlabs.io/v1/text-to-speech/{voice.id}/stream-input?model_id={voice.model}{ELEVENLABS_OUTPUT_FORMAT}",
+        ssl=ELEVENLABS_SSL_CONTEXT,
     ) as websocket:
         body = {
             "text": text,
@@ -197,16 +283,17 @@ async def elevenlabs_tts_alignment(
             "generation_config": dataclasses.asdict(voice.generation_config),
         }
 
-        await websocket.send(json.dumps(body))
-        await websocket.send(json.dumps({"text": ""}))
+        await websocket.send(orjson.dumps(body).decode())
+        await websocket.send(orjson.dumps({"text": ""}).decode())
 
-        audio = b""
+        # Appending to bytes copies the whole buffer for every chunk
+        audio = bytearray()
         alignment: list[dict] = []
         start = 0
         word: list[tuple[str, int]] = []
         length = 0
         while True:
-            r = json.loads(await websocket.recv())
+            r = orjson.loads(await websocket.recv())
             if "error" in r:
                 if r["error"] == "quota_exceeded":
                     raise ElevenLabsQuotaExceededError(r["message"])
@@ -216,13 +303,13 @@ async def elevenlabs_tts_alignment(
                     raise ElevenLabsError(r)
 
             if r["audio"]:
-                audio += base64.b64decode(r["audio"].encode())
-            if r["alignment"]:
+                audio += base64.b64decode(r["audio"])
+            if chunk_alignment := r["alignment"]:
                 for i, (c, a, l) in enumerate(
                     zip(
-                        r["alignment"]["chars"],
-                        r["alignment"]["charStartTimesMs"],
-                        r["alignment"]["charDurationsMs"],
+                        chunk_alignment["chars"],
+                        chunk_alignment["charStartTimesMs"],
+                        chunk_alignment["charDurationsMs"],
                     )
                 ):
                     length += l
@@ -256,7 +343,15 @@ async def elevenlabs_tts_alignment(
         return (
             match_target_amplitude(
                 pydub.effects.normalize(
-                    pydub.AudioSegment.from_mp3(io.BytesIO(audio))  # type: ignore
+                    # raw PCM needs no ffmpeg decode, unlike the default MP3 stream
+                    pydub.AudioSegment(
+                        data=bytes(audio),
+                        sample_width=2,
+                        frame_rate=ELEVENLABS_PCM_RATE,
+                        channels=1,
+                    )
+                    if ELEVENLABS_PCM_RATE
+                    else pydub.AudioSegment.from_mp3(io.BytesIO(audio))  # type: ignore
                 ),
                 -20.0,
             ),
@@ -264,9 +359,15 @@ async def elevenlabs_tts_alignment(
         )
 
 
+def backoff(attempt: int, base: float = 1, cap: float = 10) -> float:
+    # Capped exponential back-off with +-25% jitter so retries don't synchronise
+    return min(cap, base * 2.0**attempt) * random.uniform(0.75, 1.25)
+
+
 async def elevenlabs_tts(
     text: str, voice_id: str, model_id: str = "eleven_multilingual_v1"
 ) -> pydub.AudioSegment:
+    attempt = 0
     try:
         async with httpx.AsyncClient() as client:
             while not (
@@ -286,7 +387,8 @@ async def elevenlabs_tts(
                     await asyncio.sleep(10 * 60)
                 else:
                     logger.warning(f"TTS request not successful: {r}")
-                    await asyncio.sleep(10)
+                    await asyncio.sleep(backoff(attempt))
+                    attempt += 1
     except httpx.ReadTimeout:
         logger.warning(f"One ElevenLabs request timed out, retrying")
     except httpx.RemoteProtocolError:
@@ -302,20 +404,20 @@ def replace_sublist(
     offset: int,
     is_regex: bool = False,
 ) -> list[dict]:
+    patterns = [re.compile(s, re.IGNORECASE) for s in search] if is_regex else []
+    lowered = [s.lower() for s in search]
     result = []
     i = 0
     while i < len(seq):
         # if sequence "text" matches search sublist replace with replacement "text"
         # but with first search elements "start" time
         if i <= (len(seq) - offset - len(search)) and all(
-            [
-                (
-                    re.compile(s, re.IGNORECASE).match(d["text"])
-                    if is_regex
-                    else s.lower() == d["text"].lower()
-                )
-                for d, s in zip(seq[i + offset : i + offset + len(search)], search)
-            ]
+            (
+                patterns[j].match(d["text"])
+                if is_regex
+                else lowered[j] == d["text"].lower()
+            )
+            for j, d in enumerate(seq[i + offset : i + offset + len(search)])
         ):
             result.append(
                 {
@@ -340,34 +442,77 @@ def replace_sublist(
     return result
 
 
-async def generate_voice_from_text(
-    text: str, voice: dict
-) -> tuple[pydub.AudioSegment, list[dict]]:
-    for f0, t0 in GLOBAL_REPLACE:
-        text = re.compile(f0, re.IGNORECASE).sub(t0, text)
+def split_text(text: str) -> list[str]:
+    chunks: list[str] = []
+    for sentence in SENTENCE_SPLIT_PATTERN.split(text):
+        if chunks and len(chunks[-1]) + len(sentence) < MAX_TTS_CHARACTERS:
+            chunks[-1] += f" {sentence}"
+        else:
+            chunks.append(sentence)
+    return chunks
 
-    texts = [text]
+
+async def generate_voice_from_chunk(
+    text: str, voice: dict, tts_requests: asyncio.Semaphore
+) -> tuple[pydub.AudioSegment, list[dict]]:
     hours = 1
+    attempt = 0
+    delay: float
     while True:
-        try:
-            audio, alignment = await elevenlabs_tts_alignment(text, voice)
-            break
-        except ElevenLabsQuotaExceededError as e:
-            logger.warning(
-                f"Quota exceeded, waiting {hours} hours for quota reset: {e}"
-            )
-            await asyncio.sleep(hours * 60 * 60)
-            hours = min(24, hours + 1)
-        except ElevenLabsSystemBusyError as e:
-            logger.warning(
-                f"Elevenlabs servers busy, waiting 10s for them to catch up: {e}"
-            )
-            await asyncio.sleep(10)
-        except websockets.exceptions.ConnectionClosedError as e:
-            logger.warning(
-                f"Websocket connection closed unexpectedly, trying again in 10s: {e}"
-            )
-            await asyncio.sleep(10)
+        async with tts_requests:
+            try:
+                audio, alignment = await elevenlabs_tts_alignment(text, voice)
+                break
+            except ElevenLabsQuotaExceededError as e:
+                logger.warning(
+                    f"Quota exceeded, waiting {hours} hours for quota reset: {e}"
+                )
+                delay = hours * 60 * 60
+                hours = min(24, hours + 1)
+            except ElevenLabsSystemBusyError as e:
+                delay = backoff(attempt)
+                attempt += 1
+                logger.warning(
+                    f"Elevenlabs servers busy, waiting {delay:.1f}s for them to catch up: {e}"
+                )
+            except websockets.exceptions.ConnectionClosedError as e:
+                delay = backoff(attempt)
+                attempt += 1
+                logger.warning(
+                    f"Websocket connection closed unexpectedly, trying again in {delay:.1f}s: {e}"
+                )
+            except websockets.exceptions.InvalidStatusCode as e:
+                if e.status_code != 429:
+                    raise
+                delay = backoff(attempt)
+                attempt += 1
+                logger.warning(
+                    f"Elevenlabs rate limit hit, trying again in {delay:.1f}s: {e}"
+                )
+        # Wait outside the semaphore so other requests can use the slot meanwhile
+        await asyncio.sleep(delay)
+
+    return audio, alignment
+
+
+async def generate_voice_from_text(
+    text: str, voice: dict, tts_requests: asyncio.Semaphore
+) -> tuple[pydub.AudioSegment, list[dict]]:
+    text = GLOBAL_REPLACE_PATTERN.sub(
+        lambda m: GLOBAL_REPLACE_TARGETS[str(m.lastgroup)], text
+    )
+
+    # Long sections are synthesised sentence-chunk by sentence-chunk and stitched back together
+    audio = pydub.AudioSegment.empty()
+    alignment: list[dict] = []
+    for chunk_audio, chunk_alignment in await asyncio.gather(
+        *(
+            generate_voice_from_chunk(chunk, voice, tts_requests)
+            for chunk in split_text(text)
+        )
+    ):
+        alignment += [{**a, "start": a["start"] + len(audio)} for a in chunk_alignment]
+        audio += chunk_audio
 
     for f1, t1, offset in POST_REPLACE:
         alignment = replace_sublist(alignment, f1, t1, offset, True)
@@ -375,9 +520,34 @@ async def generate_voice_from_text(
     return audio, alignment
 
 
+def audio_dir_bases(audio_dir: pathlib.Path) -> tuple[str, str]:
+    return str(audio_dir.absolute()), f"/{audio_dir.relative_to(WEB_DIR)}"
+
+
+def section_files(bases: tuple[str, str], i: int) -> dict:
+    abs_base, rel_base = bases
+    return {
+        "audio_path": f"{abs_base}/{i:04}.mp3",
+        "audio_url": f"{rel_base}/{i:04}.mp3",
+        "alignment_path": f"{abs_base}/{i:04}.json",
+        "alignment_url": f"{rel_base}/{i:04}.json",
+    }
+
+
+def outro_files(bases: tuple[str, str]) -> dict:
+    abs_base, rel_base = bases
+    return {
+        "audio_path": f"{abs_base}/outro.mp3",
+        "audio_url": f"{rel_base}/outro.mp3",
+    }
+
+
+SPAN_TRANSLATION = str.maketrans({"\u00a0": None, "–": "-"})
+
+
 def text_to_spans(text: str | list[str]) -> list:
     return [
-        {"text": t.replace(" ", "").replace("–", "-").strip()}
+        {"text": t.translate(SPAN_TRANSLATION).strip()}
         for t in (text.split() if isinstance(text, str) else text)
     ]
 
@@ -386,10 +556,9 @@ def generate_error_manuscript(article_id: str) -> dict:
     article_url = f"{WIKI_URL}/{article_id}"
 
     res_dir = DB_DIR / ERROR_ID
-    res_dir.mkdir(parents=True, exist_ok=True)
-
     audio_dir = res_dir / AUDIO_DIR_NAME
     audio_dir.mkdir(parents=True, exist_ok=True)
+    bases = audio_dir_bases(audio_dir)
 
     article = {
         "title": article_id.replace("_", " "),
@@ -399,20 +568,14 @@ def generate_error_manuscript(article_id: str) -> dict:
         "sections": [
             {
                 "section_type": "h1",
-                "audio_path": str((audio_dir / f"{0:04}.mp3").absolute()),
-                "audio_url": f'/{((audio_dir / f"{0:04}.mp3").relative_to(WEB_DIR))}',
-                "alignment_path": str((audio_dir / f"{0:04}.json").absolute()),
-                "alignment_url": f'/{((audio_dir / f"{0:04}.json").relative_to(WEB_DIR))}',
+                **section_files(bases, 0),
                 "spans": text_to_spans("Error"),
             }
         ]
         + [
             {
                 "section_type": "p",
-                "audio_path": str((audio_dir / f"{i+1:04}.mp3").absolute()),
-                "audio_url": f'/{((audio_dir / f"{i+1:04}.mp3").relative_to(WEB_DIR))}',
-                "alignment_path": str((audio_dir / f"{i+1:04}.json").absolute()),
-                "alignment_url": f'/{((audio_dir / f"{i+1:04}.json").relative_to(WEB_DIR))}',
+                **section_files(bases, i + 1),
                 "spans": text_to_spans(s),
             }
             for i, s in enumerate(
@@ -421,10 +584,7 @@ def generate_error_manuscript(article_id: str) -> dict:
                 ]
             )
         ],
-        "outro": {
-            "audio_path": str((audio_dir / "outro.mp3").absolute()),
-            "audio_url": "/" + str((audio_dir / "outro.mp3").relative_to(WEB_DIR)),
-        },
+        "outro": outro_files(bases),
     }
     if article_id != ERROR_ID:
         article["url"] = f"{WIKI_URL}/{article_id}"
@@ -435,10 +595,9 @@ def generate_disallowed_manuscript(article_id: str) -> dict:
     article_url = f"{WIKI_URL}/{article_id}"
 
     res_dir = DB_DIR / DISALLOWED_ID
-    res_dir.mkdir(parents=True, exist_ok=True)
-
     audio_dir = res_dir / AUDIO_DIR_NAME
     audio_dir.mkdir(parents=True, exist_ok=True)
+    bases = audio_dir_bases(audio_dir)
 
     article = {
         "title": article_id.replace("_", " "),
@@ -448,20 +607,14 @@ def generate_disallowed_manuscript(article_id: str) -> dict:
         "sections": [
             {
                 "section_type": "h1",
-                "audio_path": str((audio_dir / f"{0:04}.mp3").absolute()),
-                "audio_url": f'/{((audio_dir / f"{0:04}.mp3").relative_to(WEB_DIR))}',
-                "alignment_path": str((audio_dir / f"{0:04}.json").absolute()),
-                "alignment_url": f'/{((audio_dir / f"{0:04}.json").relative_to(WEB_DIR))}',
+                **section_files(bases, 0),
                 "spans": text_to_spans("Disallowed article"),
             }
         ]
         + [
             {
                 "section_type": "p",
-                "audio_path": str((audio_dir / f"{i+1:04}.mp3").absolute()),
-                "audio_url": f'/{((audio_dir / f"{i+1:04}.mp3").relative_to(WEB_DIR))}',
-                "alignment_path": str((audio_dir / f"{i+1:04}.json").absolute()),
-                "alignment_url": f'/{((audio_dir / f"{i+1:04}.json").relative_to(WEB_DIR))}',
+                **section_files(bases, i + 1),
                 "spans": text_to_spans(s),
             }
             for i, s in enumerate(
@@ -473,10 +626,7 @@ def generate_disallowed_manuscript(article_id: str) -> dict:
                 ]
             )
         ],
-        "outro": {
-            "audio_path": str((audio_dir / "outro.mp3").absolute()),
-            "audio_url": "/" + str((audio_dir / "outro.mp3").relative_to(WEB_DIR)),
-        },
+        "outro": outro_files(bases),
     }
     if article_id != DISALLOWED_ID:
         article["url"] = f"{WIKI_URL}/{article_id}"
@@ -486,15 +636,16 @@ def generate_disallowed_manuscript(article_id: str) -> dict:
 def content_to_sections(
     content: Tag, audio_dir: pathlib.Path
 ) -> typing.Generator[dict, None, None]:
+    bases = audio_dir_bases(audio_dir)
     i = 0
-    for child in content.findChildren(recursive=False):
-        text = None
+    for child in [c for c in content.contents if isinstance(c, Tag)]:
+        text: str | list[str] | None = None
 
         if child.name == "ul" or child.name == "ol":
             text = [
-                c.text.strip()
-                for c in child.findChildren(recursive=False)
-                if c.text.strip()
+                t
+                for c in child.contents
+                if isinstance(c, Tag) and (t := c.text.strip())
             ]
         elif (
             child.name == "div"
@@ -506,14 +657,7 @@ def content_to_sections(
                 if block := c.strip():
                     yield {
                         "section_type": "cite",
-                        "audio_path": str((audio_dir / f"{i+1:04}.mp3").absolute()),
-                        "audio_url": "/"
-                        + str((audio_dir / f"{i+1:04}.mp3").relative_to(WEB_DIR)),
-                        "alignment_path": str(
-                            (audio_dir / f"{i+1:04}.json").absolute()
-                        ),
-                        "alignment_url": "/"
-                        + str((audio_dir / f"{i+1:04}.json").relative_to(WEB_DIR)),
+                        **section_files(bases, i + 1),
                         "spans": text_to_spans(block),
                     }
                     i += 1
@@ -523,30 +667,30 @@ def content_to_sections(
         if text:
             yield {
                 "section_type": child.name,
-                "audio_path": str((audio_dir / f"{i+1:04}.mp3").absolute()),
-                "audio_url": "/"
-                + str((audio_dir / f"{i+1:04}.mp3").relative_to(WEB_DIR)),
-                "alignment_path": str((audio_dir / f"{i+1:04}.json").absolute()),
-                "alignment_url": "/"
-                + str((audio_dir / f"{i+1:04}.json").relative_to(WEB_DIR)),
+                **section_files(bases, i + 1),
                 "spans": text_to_spans(text),
             }
             i += 1
 
 
+@functools.lru_cache(maxsize=4096)
+def is_disallowed(article_id: str) -> bool:
+    return (
+        any(p.match(article_id) for p in DISALLOWED_ARTICLES_PATTERNS)
+        and article_id not in ALLOWED_ACTIRLES
+    )
+
+
 def generate_manuscript(
-    article_id: str, res_dir: pathlib.Path, audio_dir: pathlib.Path
+    article_id: str,
+    res_dir: pathlib.Path,
+    audio_dir: pathlib.Path,
+    previous: dict | None = None,
 ) -> dict:
     url = f"{WIKI_URL}/{article_id}"
+    bases = audio_dir_bases(audio_dir)
 
-    if (
-        any(
-            r
-            for r in DISALLOWED_ARTICLES
-            if re.compile(r, re.IGNORECASE).match(article_id)
-        )
-        and article_id not in ALLOWED_ACTIRLES
-    ):
+    if is_disallowed(article_id):
         logger.warning(f'"{article_id}" is disallowed')
         return generate_disallowed_manuscript(article_id)
 
@@ -559,25 +703,13 @@ def generate_manuscript(
             "sections": [
                 {
                     "section_type": "h1",
-                    "audio_path": str((audio_dir / f"{0:04}.mp3").absolute()),
-                    "audio_url": "/"
-                    + str((audio_dir / f"{0:04}.mp3").relative_to(WEB_DIR)),
-                    "alignment_path": str((audio_dir / f"{0:04}.json").absolute()),
-                    "alignment_url": "/"
-                    + str((audio_dir / f"{0:04}.json").relative_to(WEB_DIR)),
+                    **section_files(bases, 0),
                     "spans": text_to_spans("Empire Wikipedia Winds of Speech"),
                 },
                 *[
                     {
                         "section_type": "p",
-                        "audio_path": str((audio_dir / f"{i+1:04}.mp3").absolute()),
-                        "audio_url": "/"
-                        + str((audio_dir / f"{i+1:04}.mp3").relative_to(WEB_DIR)),
-                        "alignment_path": str(
-                            (audio_dir / f"{i+1:04}.json").absolute()
-                        ),
-                        "alignment_url": "/"
-                        + str((audio_dir / f"{i+1:04}.json").relative_to(WEB_DIR)),
+                        **section_files(bases, i + 1),
                         "spans": text_to_spans(text),
                     }
                     for i, text in enumerate(
@@ -597,14 +729,7 @@ def generate_manuscript(
                 *[
                     {
                         "section_type": "p",
-                        "audio_path": str((audio_dir / f"{i+5:04}.mp3").absolute()),
-                        "audio_url": "/"
-                        + str((audio_dir / f"{i+5:04}.mp3").relative_to(WEB_DIR)),
-                        "alignment_path": str(
-                            (audio_dir / f"{i+5:04}.json").absolute()
-                        ),
-                        "alignment_url": "/"
-                        + str((audio_dir / f"{i+5:04}.json").relative_to(WEB_DIR)),
+                        **section_files(bases, i + 5),
                         "spans": text_to_spans(text),
                     }
                     for i, text in enumerate(
@@ -616,23 +741,38 @@ def generate_manuscript(
                     )
                 ],
             ],
-            "outro": {
-                "audio_path": str((audio_dir / "outro.mp3").absolute()),
-                "audio_url": "/" + str((audio_dir / "outro.mp3").relative_to(WEB_DIR)),
-            },
+            "outro": outro_files(bases),
         }
 
+    # Only a finished manuscript can stand in for an unchanged page; placeholders
+    # and failed generations need the full page
+    if not (previous and previous.get("state") == "done" and previous.get("sections")):
+        previous = None
+
+    headers = {}
+    if previous and previous.get("etag"):
+        headers["If-None-Match"] = previous["etag"]
+    if previous and previous.get("last_modified"):
+        headers["If-Modified-Since"] = previous["last_modified"]
+
     try:
-        response = httpx.get(url, verify=False, timeout=60)
+        response = WIKI_CLIENT.get(url, headers=headers)
     except Exception as e:
         logger.error(f'Could not get article "{url}": {e}')
         return generate_error_manuscript(article_id)
 
+    if previous and response.status_code == 304:
+        logger.info(f'Article "{url}" not modified since last download')
+        return {
+            **{k: v for k, v in previous.items() if k in CACHED_MANUSCRIPT_KEYS},
+            "state": "generating",
+        }
+
     if not response.is_success:
         logger.error(f'Could not get article "{url}": {response}')
         return generate_error_manuscript(article_id)
 
-    soup = BeautifulSoup(response.text, "html.parser")
+    soup = BeautifulSoup(response.content, "lxml")
     content = soup.find("div", {"id": "mw-content-text"})
 
     if not isinstance(content, Tag):
@@ -643,8 +783,8 @@ def generate_manuscript(
     img_tag = content.find("img")
     img_url = f"{PD_URL}{img_tag['src']}" if isinstance(img_tag, Tag) else None
 
-    while isinstance(content, Tag) and len(list(content.children)) == 1:
-        content = list(content.children)[0]  # type: ignore
+    while isinstance(content, Tag) and len(content.contents) == 1:
+        content = content.contents[0]  # type: ignore
 
     title_tag = soup.find("h1")
     if not isinstance(title_tag, Tag):
@@ -656,20 +796,14 @@ def generate_manuscript(
     if isinstance(toc, Tag):
         toc.decompose()  # remove Table of Content
 
-    for child in content.findChildren("div", recursive=False):
-        if (
-            not isinstance(child, Tag)
-            or not child.attrs
-            or "class" not in child.attrs
-            or "ic" not in child["class"]
+    for child in [c for c in content.contents if isinstance(c, Tag)]:
+        if child.name == "div" and (
+            not child.attrs or "class" not in child.attrs or "ic" not in child["class"]
         ):
             child.decompose()
-    for child in content.find_all("sup"):
-        child.decompose()
-    for child in content.find_all("table"):
-        child.decompose()
-
-    (audio_dir / f"{0:04}").mkdir(parents=True, exist_ok=True)
+    for child in content.find_all(["sup", "table"]):
+        if not child.decomposed:  # footnotes inside an already removed table
+            child.decompose()
 
     sections = list(content_to_sections(content, audio_dir))
 
@@ -680,25 +814,23 @@ def generate_manuscript(
         "sections": [
             {
                 "section_type": "h1",
-                "audio_path": str((audio_dir / f"{0:04}.mp3").absolute()),
-                "audio_url": "/"
-                + str((audio_dir / f"{0:04}.mp3").relative_to(WEB_DIR)),
-                "alignment_path": str((audio_dir / f"{0:04}.json").absolute()),
-                "alignment_url": "/"
-                + str((audio_dir / f"{0:04}.json").relative_to(WEB_DIR)),
+                **section_files(bases, 0),
                 "spans": text_to_spans(title),
             },
             *sections,
         ],
-        "outro": {
-            "audio_path": str((audio_dir / "outro.mp3").absolute()),
-            "audio_url": "/" + str((audio_dir / "outro.mp3").relative_to(WEB_DIR)),
-        },
+        "outro": outro_files(bases),
     }
 
     # Add image
     if img_url:
         article["img"] = img_url
+
+    # Validators for conditional requests on the next update
+    if etag := response.headers.get("etag"):
+        article["etag"] = etag
+    if last_modified := response.headers.get("last-modified"):
+        article["last_modified"] = last_modified
     return article
 
 
@@ -739,29 +871,45 @@ def generate_complete_audio(article_id: str) -> None:
         return
 
     res_dir = DB_DIR / article_id
-    res_dir.mkdir(parents=True, exist_ok=True)
-
     audio_dir = res_dir / AUDIO_DIR_NAME
     audio_dir.mkdir(parents=True, exist_ok=True)
 
+    # The article may have been regenerated while rendering, in which case this
+    # render is stale and must not be attached to the new manuscript
+    rendered = {
+        "_id": manuscript["_id"],
+        "content_hash": manuscript.get("content_hash"),
+        "lastmod": manuscript.get("lastmod"),
+    }
+    if not COLLECTION.count_documents(rendered, limit=1):
+        logger.warning(f'"{article_id}" changed while rendering, discarding audio')
+        return
+
     audio_path = audio_dir / f"{article_id}.mp3"
-    sound.export(audio_path, format="mp3")
+    atomic_export(sound, audio_path)
 
-    COLLECTION.update_one(
-        {"_id": manuscript["_id"]},
+    if not COLLECTION.update_one(
+        rendered,
         {
             "$set": {
                 "complete_audio_path": str(audio_path.absolute()),
                 "complete_audio_url": f"/{audio_path.relative_to(WEB_DIR)}",
             }
         },
-    )
+    ).matched_count:
+        logger.warning(
+            f'"{article_id}" changed while rendering, not attaching complete audio'
+        )
 
 
 def generate_audio(manuscript: dict, task: str) -> None:
-    voice = random.choice([v for v in VOICES if v["use"]])
+    # Regenerated articles keep their voice, so unchanged sections hit the TTS cache
+    if (v := VOICES_BY_NAME.get(manuscript.get("voice", ""))) and v["use"]:
+        voice = v
+    else:
+        voice = random.choice(USABLE_VOICES)
     if "forced_voice" in manuscript:
-        v = next((v for v in VOICES if v["name"] == manuscript["forced_voice"]), None)
+        v = VOICES_BY_NAME.get(manuscript["forced_voice"])
         if v:
             voice = v
         else:
@@ -769,33 +917,137 @@ def generate_audio(manuscript: dict, task: str) -> None:
                 f'Forced voice "{manuscript["forced_voice"]}" does not exist in config, please add'
             )
 
+    manuscript["voice"] = voice["name"]
     logger.info(f'Chose voice "{voice["name"]}" for "{manuscript["title"]}"')
 
-    for i, section in enumerate(manuscript["sections"]):
-        COLLECTION.update_one(
-            {"_id": manuscript["_id"]},
-            {"$set": {"progress": i / len(manuscript["sections"])}},
+    asyncio.run(generate_manuscript_audio(manuscript, voice))
+    logger.info(f'All TTS audio segments generated for "{manuscript["title"]}"')
+
+
+def tts_cache_path(text: str, voice: dict) -> pathlib.Path:
+    key = hashlib.sha256(
+        orjson.dumps(
+            [
+                {k: v for k, v in voice.items() if k != "use"},
+                ELEVENLABS_PCM_RATE,
+                GLOBAL_REPLACE,
+                POST_REPLACE,
+                text,
+            ],
+            option=orjson.OPT_SORT_KEYS,
         )
+    ).hexdigest()
+    # Sharded by key prefix to keep directory listings and lookups small
+    return TTS_CACHE_DIR / key[:2] / key
 
-        if text := " ".join(s["text"] for s in section["spans"]).strip():
-            audio, alignment = asyncio.run(generate_voice_from_text(text, voice))
-            if section["section_type"] == "ul" or section["section_type"] == "ol":
-                for s in section["spans"]:
-                    alignment = replace_sublist(
-                        alignment, s["text"].split(), s["text"], 0, False
-                    )
 
-            audio.export(section["audio_path"])
-            json.dump(alignment, open(section["alignment_path"], "w"))
-            logger.info(
-                f'{i}/{len(manuscript["sections"])-1} TTS audio segments generated for "{manuscript["title"]}"'
-            )
-        else:
-            logger.info(
-                f'{i}/{len(manuscript["sections"])-1} TTS audio segments generated for "{manuscript["title"]}"'
-            )
-    audio, _ = asyncio.run(
-        generate_voice_from_text(
+# Files are written next to their destination and renamed into place, so the web
+# server and the cache never see a partially written file
+def temporary_path(path: pathlib.Path) -> pathlib.Path:
+    return path.with_name(f"{path.name}.{uuid.uuid4().hex}{TEMPORARY_SUFFIX}")
+
+
+def atomic_write_bytes(path: pathlib.Path, data: bytes) -> None:
+    tmp_path = temporary_path(path)
+    tmp_path.write_bytes(data)
+    os.replace(tmp_path, path)
+
+
+def atomic_link(src: str | pathlib.Path, dst: str | pathlib.Path) -> None:
+    # rename() is a no-op between links to the same file and would leave the temp link
+    if os.path.exists(dst) and os.path.samefile(src, dst):
+        return
+    tmp_path = temporary_path(pathlib.Path(dst))
+    # Files are only ever replaced, never rewritten in place, so sharing an inode
+    # is safe; fall back to copying across filesystems
+    try:
+        os.link(src, tmp_path)
+    except OSError:
+        shutil.copyfile(src, tmp_path)
+    os.replace(tmp_path, dst)
+
+
+def atomic_export(audio: pydub.AudioSegment, path: str | pathlib.Path) -> None:
+    tmp_path = temporary_path(pathlib.Path(path))
+    audio.export(tmp_path, format="mp3")
+    os.replace(tmp_path, path)
+
+
+def store_section_audio(
+    audio: pydub.AudioSegment,
+    alignment: list[dict],
+    audio_path: str,
+    cache_path: pathlib.Path,
+) -> None:
+    atomic_export(audio, audio_path)
+    cache_path.parent.mkdir(parents=True, exist_ok=True)
+    atomic_write_bytes(cache_path.with_suffix(".json"), orjson.dumps(alignment))
+    atomic_link(audio_path, cache_path.with_suffix(".mp3"))
+
+
+def restore_section_audio(audio_path: str, cache_path: pathlib.Path) -> list[dict]:
+    atomic_link(cache_path.with_suffix(".mp3"), audio_path)
+    os.utime(cache_path.with_suffix(".mp3"))  # mark as recently used for pruning
+    return list(orjson.loads(cache_path.with_suffix(".json").read_bytes()))
+
+
+def prune_tts_cache() -> None:
+    # One worker prunes at a time, at most once per TTS_CACHE_PRUNE_INTERVAL; the
+    # marker's mtime records the last prune
+    marker = TTS_CACHE_DIR / "pruned"
+    with open(marker, "a") as lock:
+        try:
+            fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            return
+        if time.time() - marker.stat().st_mtime < TTS_CACHE_PRUNE_INTERVAL:
+            return
+        os.utime(marker)
+
+        remove_least_recently_used_tts_cache_entries()
+
+
+def remove_least_recently_used_tts_cache_entries() -> None:
+    entries: list[tuple[float, int, pathlib.Path]] = []
+    for shard in os.scandir(TTS_CACHE_DIR):
+        if not shard.is_dir():
+            continue
+        for entry in os.scandir(shard.path):
+            if not entry.name.endswith(".mp3"):
+                continue
+            try:
+                stat = entry.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, pathlib.Path(entry.path)))
+
+    # Least recently used first
+    size = sum(s for _, s, _ in entries)
+    for _, entry_size, path in sorted(entries):
+        if size <= TTS_CACHE_MAX_SIZE:
+            break
+        path.with_suffix(".json").unlink(missing_ok=True)
+        path.unlink(missing_ok=True)
+        size -= entry_size
+
+
+async def generate_manuscript_audio(manuscript: dict, voice: dict) -> None:
+    # sections with identical text (and list structure) are only synthesised once
+    generated: dict[tuple, dict] = {}
+    duplicates: list[tuple[dict, dict]] = []
+    jobs: list[tuple[str, dict]] = []
+    for section in manuscript["sections"]:
+        key = (
+            section["section_type"] in ["ul", "ol"],
+            tuple(s["text"] for s in section["spans"]),
+        )
+        if key in generated:
+            duplicates.append((generated[key], section))
+        elif text := " ".join(s["text"] for s in section["spans"]).strip():
+            generated[key] = section
+            jobs.append((text, section))
+    jobs.append(
+        (
             f'This article was read aloud by the artificial voice, "{voice["name"]}".'
             + (
                 " All content of this article is the original work of Profound Decisions and can be found on the Empire wikipedia."
@@ -803,11 +1055,84 @@ def generate_audio(manuscript: dict, task: str) -> None:
                 else ""
             )
             + " Thank you for listening.",
-            voice,
+            manuscript["outro"],
         )
     )
-    audio.export(manuscript["outro"]["audio_path"])
-    logger.info(f'All TTS audio segments generated for "{manuscript["title"]}"')
+
+    semaphore = asyncio.Semaphore(TTS_CONCURRENCY)
+    tts_requests = asyncio.Semaphore(TTS_REQUESTS_PER_WORKER)
+    loop = asyncio.get_running_loop()
+    done = 0
+    progress_updated = time.monotonic()
+    stored = False
+
+    async def synthesise(text: str, section: dict) -> None:
+        nonlocal done, progress_updated, stored
+        cache_path = tts_cache_path(text, voice)
+        # File I/O and ffmpeg encoding run on the pool so the event loop keeps
+        # serving the other sections' websockets
+        alignment = None
+        if (
+            cache_path.with_suffix(".mp3").exists()
+            and cache_path.with_suffix(".json").exists()
+        ):
+            try:
+                alignment = await loop.run_in_executor(
+                    EXPORT_POOL,
+                    restore_section_audio,
+                    section["audio_path"],
+                    cache_path,
+                )
+            except FileNotFoundError:  # pruned since the check above
+                pass
+        if alignment is None:
+            async with semaphore:
+                audio, alignment = await generate_voice_from_text(
+                    text, voice, tts_requests
+                )
+            await loop.run_in_executor(
+                EXPORT_POOL,
+                store_section_audio,
+                audio,
+                alignment,
+                section["audio_path"],
+                cache_path,
+            )
+            stored = True
+
+        if section.get("section_type") in ["ul", "ol"]:
+            for s in section["spans"]:
+                alignment = replace_sublist(
+                    alignment, s["text"].split(), s["text"], 0, False
+                )
+        if "alignment_path" in section:
+            await loop.run_in_executor(
+                EXPORT_POOL,
+                atomic_write_bytes,
+                pathlib.Path(section["alignment_path"]),
+                orjson.dumps(alignment),
+            )
+
+        done += 1
+        if time.monotonic() - progress_updated >= PROGRESS_UPDATE_INTERVAL:
+            progress_updated = time.monotonic()
+            await asyncio.to_thread(
+                COLLECTION.update_one,
+                {"_id": manuscript["_id"]},
+                {"$set": {"progress": done / len(jobs)}},
+            )
+        logger.info(
+            f'{done}/{len(jobs)} TTS audio segments generated for "{manuscript["title"]}"'
+        )
+
+    await asyncio.gather(*(synthesise(text, section) for text, section in jobs))
+    # The cache can only have outgrown its limit if something was added
+    if stored:
+        await loop.run_in_executor(EXPORT_POOL, prune_tts_cache)
+
+    for original, duplicate in duplicates:
+        atomic_link(original["audio_path"], duplicate["audio_path"])
+        atomic_link(original["alignment_path"], duplicate["alignment_path"])
 
 
 def insert_or_replace(manuscript: dict) -> None:
@@ -823,10 +1148,6 @@ def update_manuscript(manuscript: dict, task: str = "Updating manuscript") -> No
     manuscript["lastmod"] = datetime.datetime.now()
     insert_or_replace(manuscript)
 
-    logger.info(f'Generating complete audio file for "{manuscript["title"]}"')
-    generate_complete_audio(manuscript["_id"])
-    logger.info(f'Complete audio file generated for "{manuscript["title"]}"')
-
 
 def get_article(article_id: str) -> typing.Any:
     article_id = article_id.replace(" ", "_")
@@ -835,131 +1156,256 @@ def get_article(article_id: str) -> typing.Any:
     return COLLECTION.find_one({"_id": article_id})
 
 
-def article_processor(queue: multiprocessing.Queue) -> None:
+def count_entries(path: pathlib.Path) -> int:
+    with os.scandir(path) as it:
+        return sum(1 for entry in it if not entry.name.endswith(TEMPORARY_SUFFIX))
+
+
+def remove_stale_temporary_files(path: pathlib.Path) -> None:
+    # Left behind by interrupted atomic writes; recent ones may still be in progress
+    # (e.g. the complete audio render)
+    with os.scandir(path) as it:
+        for entry in it:
+            if not entry.name.endswith(TEMPORARY_SUFFIX):
+                continue
+            try:
+                if time.time() - entry.stat().st_mtime > STALE_TEMPORARY_AGE:
+                    pathlib.Path(entry.path).unlink(missing_ok=True)
+            except FileNotFoundError:
+                pass
+
+
+def claim_article(article_id: str, in_progress: typing.MutableMapping) -> bool:
+    with ARTICLES_IN_PROGRESS_LOCK:
+        if article_id in in_progress:
+            return False
+        in_progress[article_id] = os.getpid()
+        return True
+
+
+def article_processor(
+    queue: multiprocessing.Queue,
+    complete_audio_queue: multiprocessing.Queue,
+    in_progress: typing.MutableMapping,
+) -> None:
+    # pymongo is not fork-safe, each worker needs its own client
+    global COLLECTION
+    COLLECTION = connect_collection()
+
     while True:
         article_id = queue.get(block=True, timeout=None)
 
-        logger.info(
-            f'Processing "{article_id}" ({queue.qsize()} articles left in queue)'
-        )
-        if not GENERATE_ARTICLES:
+        if not claim_article(article_id, in_progress):
             logger.info(
-                f'Article generation disabled, skipping "{article_id}" ({queue.qsize()} articles left in queue)'
+                f'"{article_id}" already being processed by another worker, skipping ({queue.qsize()} articles left in queue)'
             )
             continue
+        try:
+            process_article(article_id, queue, complete_audio_queue)
+        except Exception:
+            # Keep the worker alive; the article is regenerated on its next request
+            logger.exception(f'Failed to process "{article_id}"')
+            try:
+                COLLECTION.update_one(
+                    {"_id": article_id}, {"$set": {"state": "generating"}}
+                )
+            except pymongo.errors.PyMongoError:
+                logger.exception(f'Could not mark "{article_id}" for regeneration')
+        finally:
+            in_progress.pop(article_id, None)
 
-        res_dir = DB_DIR / article_id
-        res_dir.mkdir(parents=True, exist_ok=True)
 
-        audio_dir = res_dir / AUDIO_DIR_NAME
-        audio_dir.mkdir(parents=True, exist_ok=True)
+def complete_audio_processor(
+    queue: multiprocessing.Queue, article_queue: multiprocessing.Queue
+) -> None:
+    global COLLECTION
+    COLLECTION = connect_collection()
 
-        try:
-            manuscript = {
-                "_id": article_id,
-                **generate_manuscript(article_id, res_dir, audio_dir),
-            }
+    # Failed renders per article; a forced regeneration usually restores the same
+    # cached audio, so repeating it indefinitely would loop between the processes
+    failures: dict[str, int] = {}
+    while True:
+        article_id = queue.get(block=True, timeout=None)
 
-            if manuscript["state"] == "disallowed":
-                manuscript["lastmod"] = datetime.datetime.now()
-                insert_or_replace(manuscript)
-                queue.put(DISALLOWED_ID)
-                continue
-            elif manuscript["state"] == "error":
-                manuscript["lastmod"] = datetime.datetime.now()
-                insert_or_replace(manuscript)
-                queue.put(ERROR_ID)
+        try:
+            article = COLLECTION.find_one({"_id": article_id})
+            if not isinstance(article, dict) or "complete_audio_url" in article:
                 continue
 
-            existing_manuscript = COLLECTION.find_one({"_id": article_id})
-
-            if existing_manuscript is not None:
-                if manuscript["_id"] in ALWAYS_UPDATE:
-                    logger.warning(
-                        f'Article "{manuscript["title"]}" ({manuscript["_id"]}) in "always update", updating manuscript'
-                    )
-                    update_manuscript(manuscript)
-                elif (
-                    "state" in existing_manuscript
-                    and existing_manuscript["state"] == "generating"
-                ):
-                    logger.warning(
-                        f'Article "{manuscript["title"]}" ({manuscript["url"]}) interrupted during generation, re-generating manuscript'
+            try:
+                logger.info(f'Generating complete audio file for "{article["title"]}"')
+                generate_complete_audio(article_id)
+                logger.info(f'Complete audio file generated for "{article["title"]}"')
+                failures.pop(article_id, None)
+            except Exception as e:
+                failures[article_id] = failures.get(article_id, 0) + 1
+                if failures[article_id] >= MAX_COMPLETE_AUDIO_ATTEMPTS:
+                    logger.error(
+                        f'Article "{article["title"]}" still has breaking errors after regenerating, giving up - "{e}"'
                     )
-                    update_manuscript(manuscript)
-                elif len(manuscript["sections"]) + 1 > len(list(audio_dir.iterdir())):
-                    logger.warning(
-                        f'Article "{manuscript["title"]}" ({manuscript["url"]}) has fewer generated files ({len(list(audio_dir.iterdir()))}) than needed ({len(manuscript["sections"]) + 1}), regenerating files'
+                    continue
+                logger.error(
+                    f'Article "{article["title"]}" has breaking errors, force-updating manuscript - "{e}"'
+                )
+                # The article workers regenerate manuscripts interrupted during generation
+                COLLECTION.update_one(
+                    {"_id": article_id}, {"$set": {"state": "generating"}}
+                )
+                article_queue.put(article_id)
+        except pymongo.errors.PyMongoError:
+            logger.exception(f'Could not render complete audio for "{article_id}"')
+
+
+def process_article(
+    article_id: str,
+    queue: multiprocessing.Queue,
+    complete_audio_queue: multiprocessing.Queue,
+) -> None:
+    logger.info(f'Processing "{article_id}" ({queue.qsize()} articles left in queue)')
+    if not GENERATE_ARTICLES:
+        logger.info(
+            f'Article generation disabled, skipping "{article_id}" ({queue.qsize()} articles left in queue)'
+        )
+        return
+
+    res_dir = DB_DIR / article_id
+    audio_dir = res_dir / AUDIO_DIR_NAME
+    audio_dir.mkdir(parents=True, exist_ok=True)
+    remove_stale_temporary_files(audio_dir)
+
+    try:
+        existing_manuscript = COLLECTION.find_one({"_id": article_id})
+        manuscript = {
+            "_id": article_id,
+            **generate_manuscript(article_id, res_dir, audio_dir, existing_manuscript),
+        }
+        manuscript["content_hash"] = manuscript_hash(manuscript)
+        if existing_manuscript and "voice" in existing_manuscript:
+            manuscript.setdefault("voice", existing_manuscript["voice"])
+
+        if manuscript["state"] == "disallowed":
+            manuscript["lastmod"] = datetime.datetime.now()
+            insert_or_replace(manuscript)
+            queue.put(DISALLOWED_ID)
+            return
+        elif manuscript["state"] == "error":
+            manuscript["lastmod"] = datetime.datetime.now()
+            insert_or_replace(manuscript)
+            queue.put(ERROR_ID)
+            return
+
+        if existing_manuscript is not None:
+            if manuscript["_id"] in ALWAYS_UPDATE:
+                logger.warning(
+                    f'Article "{manuscript["title"]}" ({manuscript["_id"]}) in "always update", updating manuscript'
+                )
+                update_manuscript(manuscript)
+            elif (
+                "state" in existing_manuscript
+                and existing_manuscript["state"] == "generating"
+            ):
+                logger.warning(
+                    f'Article "{manuscript["title"]}" ({manuscript["url"]}) interrupted during generation, re-generating manuscript'
+                )
+                update_manuscript(manuscript)
+            elif len(manuscript["sections"]) + 1 > (
+                generated := count_entries(audio_dir)
+            ):
+                logger.warning(
+                    f'Article "{manuscript["title"]}" ({manuscript["url"]}) has fewer generated files ({generated}) than needed ({len(manuscript["sections"]) + 1}), regenerating files'
+                )
+                update_manuscript(manuscript)
+            elif manuscript_changed(manuscript, existing_manuscript):
+                if REFRESH_ARTICLES or manuscript["_id"] in ALWAYS_REFRESH:
+                    logger.info(
+                        f'Article "{manuscript["title"]}" ({manuscript["url"]}) changed, updating manuscript'
                     )
                     update_manuscript(manuscript)
-                elif manuscript_changed(manuscript, existing_manuscript):
-                    if REFRESH_ARTICLES or manuscript["_id"] in ALWAYS_REFRESH:
-                        logger.info(
-                            f'Article "{manuscript["title"]}" ({manuscript["url"]}) changed, updating manuscript'
-                        )
-                        update_manuscript(manuscript)
-                    else:
-                        logger.warning(
-                            f'Article "{manuscript["title"]}" ({manuscript["url"]}) changed, but manuscript updating disabled - skipping'
-                        )
                 else:
-                    logger.info(
-                        f'Article "{manuscript["title"]}" ({manuscript["url"]}) unchanged, skipping'
+                    logger.warning(
+                        f'Article "{manuscript["title"]}" ({manuscript["url"]}) changed, but manuscript updating disabled - skipping'
                     )
-
             else:
                 logger.info(
-                    f'Article "{manuscript["title"]}" ({manuscript["url"]}) not yet generated, generating manuscript'
+                    f'Article "{manuscript["title"]}" ({manuscript["url"]}) unchanged, skipping'
                 )
-                update_manuscript(manuscript, "Generating manuscript")
-        except httpx.ConnectError as e:
-            logger.warning(f'Could not GET article "{article_id}": {e}')
+                # Keep the hash and validators current so later fetches can 304
+                if stale := {
+                    k: manuscript.get(k)
+                    for k in ["content_hash", "etag", "last_modified"]
+                    if manuscript.get(k) != existing_manuscript.get(k)
+                }:
+                    COLLECTION.update_one({"_id": article_id}, {"$set": stale})
 
-        if (
-            (a := COLLECTION.find_one({"_id": article_id}))
-            and isinstance(a, dict)
-            and "complete_audio_url" not in a
-        ):
-            try:
-                generate_complete_audio(manuscript["_id"])
-            except Exception as e:
-                logger.error(
-                    f'Article "{manuscript["title"]}" has breaking errors, force-updating manuscript - "{e}"'
-                )
-                update_manuscript(manuscript, "Manuscript error")
-                generate_complete_audio(manuscript["_id"])
+        else:
+            logger.info(
+                f'Article "{manuscript["title"]}" ({manuscript["url"]}) not yet generated, generating manuscript'
+            )
+            update_manuscript(manuscript, "Generating manuscript")
+    except httpx.ConnectError as e:
+        logger.warning(f'Could not GET article "{article_id}": {e}')
+
+    # Rendering the complete audio is handed off so this worker can start on the
+    # next article right away
+    if (
+        (a := COLLECTION.find_one({"_id": article_id}))
+        and isinstance(a, dict)
+        and "complete_audio_url" not in a
+    ):
+        complete_audio_queue.put(article_id)
 
 
 article_queue: multiprocessing.Queue = multiprocessing.Queue()
-multiprocessing.Process(target=article_processor, args=(article_queue,)).start()
+complete_audio_queue: multiprocessing.Queue = multiprocessing.Queue()
+articles_in_progress = multiprocessing.Manager().dict()
+for _ in range(ARTICLE_WORKERS):
+    multiprocessing.Process(
+        target=article_processor,
+        args=(article_queue, complete_audio_queue, articles_in_progress),
+        daemon=True,
+    ).start()
+multiprocessing.Process(
+    target=complete_audio_processor,
+    args=(complete_audio_queue, article_queue),
+    daemon=True,
+).start()
 
 
 @app.get("/sitemap.xml")
 def sitemap() -> Response:
     sitemap = '<?xml version="1.0" encoding="UTF-8"?>\n<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n'
+    # Only the fields the sitemap needs, rather than every manuscript's sections
     for manuscript in tqdm.tqdm(
-        list(sorted(COLLECTION.find(), key=lambda a: a["_id"])),
+        list(COLLECTION.find({"state": "done"}, {"_id": 1, "lastmod": 1}).sort("_id")),
         desc="Building sitemap.xml",
     ):
-        if manuscript["state"] == "done":
-            sitemap += "\n	<url>"
-            sitemap += f"\n		<loc>https://www.pprofounddecisions.co.uk/{"empire-wiki/" if manuscript["_id"] else ""}{urllib.parse.quote_plus(manuscript["_id"])}</loc>"
-            sitemap += (
-                f"\n		<lastmod>{manuscript["lastmod"].date().isoformat()}</lastmod>"
-            )
-            sitemap += f"\n		<changefreq>monthly</changefreq>"
-            sitemap += "\n	</url>"
-            sitemap += "\n"
+        sitemap += "\n	<url>"
+        sitemap += f"\n		<loc>https://www.pprofounddecisions.co.uk/{"empire-wiki/" if manuscript["_id"] else ""}{urllib.parse.quote_plus(manuscript["_id"])}</loc>"
+        sitemap += f"\n		<lastmod>{manuscript["lastmod"].date().isoformat()}</lastmod>"
+        sitemap += f"\n		<changefreq>monthly</changefreq>"
+        sitemap += "\n	</url>"
+        sitemap += "\n"
     sitemap += "\n</urlset>"
     sitemap += "\n"
 
     return Response(content=sitemap, media_type="application/xml")
 
 
+index_html_cache: tuple[int, str] = (0, "")
+
+
+def read_index_html() -> str:
+    global index_html_cache
+    index_path = WEB_DIR / "index.html"
+    mtime = index_path.stat().st_mtime_ns
+    if mtime != index_html_cache[0]:
+        index_html_cache = (mtime, index_path.read_text())
+    return index_html_cache[1]
+
+
 @app.get("/empire-wiki/{article_id:path}")
 def index(article_id: str) -> HTMLResponse:
-    with open(WEB_DIR / "index.html") as f:
-        index = f.read()
+    index = read_index_html()
     article = get_article(article_id)
     if article:
         if "title" in article and article["title"]:
@@ -1090,7 +1536,8 @@ def complete_audio(article_id: str) -> str:
         generate_complete_audio(article_id)
 
     manuscript = get_article(article_id)
-    assert isinstance(manuscript, dict)
+    if not isinstance(manuscript, dict) or "complete_audio_url" not in manuscript:
+        raise Exception("Complete audio not generated")
     return str(manuscript["complete_audio_url"])
 
 